@@ -1,32 +1,75 @@
-import json
-from uuid import uuid4
+import os
+import sys
 from typing import Any
+from itertools import count
 from collections import deque
 
-from pydantic import BaseModel, PrivateAttr
+import msgspec
 
+_ID_PREFIX = os.urandom(4).hex()
+_id_counter = count()
 
-class Message(BaseModel):
-    _id: str = PrivateAttr(default_factory=lambda: str(uuid4()))
-    data: dict[str, Any]
 
+def _next_id() -> str:
+    return f"{_ID_PREFIX}{next(_id_counter):x}"
 
-class Channel(BaseModel):
-    name: str
-    ready_messages: deque[Message] = deque()
-    unacked_messages: dict[str, Message] = dict()
 
+class Message:
+    __slots__ = ("_id", "data")
 
-class Response(BaseModel):
-    data: dict[str, Any] = {}
+    def __init__(self, data: dict[str, Any]):
+        self._id: str = _next_id()
+        self.data = data
+
+
+class Channel:
+    __slots__ = ("name", "ready_messages", "unacked_messages")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ready_messages: deque[Message] = deque()
+        self.unacked_messages: dict[str, Message] = {}
+
+    def stats(self) -> dict[str, int]:
+        ready = len(self.ready_messages)
+        unacked = len(self.unacked_messages)
+        return {
+            "ready_messages": ready,
+            "unacked_messages": unacked,
+            "total": ready + unacked,
+        }
+
+
+class Response(msgspec.Struct):
+    data: dict[str, Any] = msgspec.field(default_factory=dict)
     message: str = ""
     error: str = ""
     message_id: str = ""
 
 
+_encoder = msgspec.json.Encoder()
+_decoder = msgspec.json.Decoder()
+
+_RESPONSE_START = {
+    "type": "http.response.start",
+    "status": 200,
+    "headers": [
+        (b"content-type", b"application/json"),
+    ],
+}
+
+
 class Broker:
     def __init__(self):
         self.channels: dict[str, Channel] = {}
+        self.handlers = {
+            "/register": self.register,
+            "/send": self.send,
+            "/read": self.read,
+            "/confirm": self.confirm,
+            "/purge": self.purge,
+            "/stats": self.stats,
+        }
 
     async def __call__(self, scope, receive, send) -> None:
         try:
@@ -34,66 +77,69 @@ class Broker:
         except Exception as err:
             result = Response(error=str(err))
 
-        await send(
-            {
-                "type": "http.response.start",
-                "status": 200,
-                "headers": [
-                    [b"Content-Type", b"application/json"],
-                ],
-            }
-        )
+        await send(_RESPONSE_START)
         await send(
             {
                 "type": "http.response.body",
-                "body": json.dumps(result.model_dump()).encode("utf-8"),
+                "body": _encoder.encode(result),
             }
         )
 
-    async def route(self, scope, receive):
+    async def read_body(self, receive) -> bytes:
         request = await receive()
+        if not request.get("more_body", False):
+            return request.get("body", b"")
 
-        handlers = {
-            "/register": self.register,
-            "/send": self.send,
-            "/read": self.read,
-            "/confirm": self.confirm,
-            "/purge": self.purge,
-            "/stats": self.stats,
-        }
+        chunks: list[bytes] = [request.get("body", b"")]
+        more_body = True
+        while more_body:
+            request = await receive()
+            chunks.append(request.get("body", b""))
+            more_body = request.get("more_body", False)
+        return b"".join(chunks)
 
-        path = scope.get("path")
-        if path in handlers:
-            body = json.loads(request.get("body", b""))
-            return await handlers[path](body)
+    async def route(self, scope, receive):
+        raw_body = await self.read_body(receive)
+
+        handler = self.handlers.get(scope.get("path"))
+        if handler is not None:
+            body = _decoder.decode(raw_body or b"{}")
+            return await handler(body)
         else:
             return Response(error="Unknown path")
 
     async def register(self, body) -> Response:
         channel_name = body.get("channel")
+        if not isinstance(channel_name, str):
+            return Response(error="Channel name must be a string")
         if channel_name in self.channels:
             return Response(error=f"Channel {channel_name} already exists")
-        self.channels[channel_name] = Channel(name=channel_name)
+        channel_name = sys.intern(channel_name)
+        self.channels[channel_name] = Channel(channel_name)
         return Response(
             message=f"Channel {channel_name} successfully registred"
         )
 
     async def send(self, body) -> Response:
-        message = Message.model_validate(body)
+        data = body.get("data")
+        if not isinstance(data, dict):
+            return Response(error="Message data must be an object")
+        message = Message(data)
         channel_name = body.get("channel")
-        if channel_name in self.channels:
-            self.channels[channel_name].ready_messages.append(message)
-            return Response(data=message.data, message_id=message._id)
-        else:
+        channel = self.channels.get(channel_name)
+        if channel is None:
             return Response(error=f"Channel {channel_name} does not exist")
+        channel.ready_messages.append(message)
+        return Response(data=message.data, message_id=message._id)
 
     async def read(self, body) -> Response:
         channel_name = body.get("channel")
-        if channel_name not in self.channels:
+        channel = self.channels.get(channel_name)
+        if channel is None:
             return Response(message=f"Channel {channel_name} does not exist")
-        if messages := self.channels[channel_name].ready_messages:
+        if messages := channel.ready_messages:
             message = messages.popleft()
-            self.channels[channel_name].unacked_messages[message._id] = message
+            channel.unacked_messages[message._id] = message
             return Response(data=message.data, message_id=message._id)
         else:
             return Response(message="No messages in channel")
@@ -101,9 +147,10 @@ class Broker:
     async def confirm(self, body) -> Response:
         channel_name = body.get("channel")
         message_id = body.get("message_id")
-        if channel_name not in self.channels:
+        channel = self.channels.get(channel_name)
+        if channel is None:
             return Response(error=f"Channel {channel_name} does not exist")
-        if self.channels[channel_name].unacked_messages.pop(message_id, False):
+        if channel.unacked_messages.pop(message_id, False):
             return Response(
                 message=f"Message confirmed!", message_id=message_id
             )
@@ -114,32 +161,23 @@ class Broker:
 
     async def purge(self, body) -> Response:
         channel_name = body.get("channel")
-        if channel_name in self.channels:
-            self.channels[channel_name].ready_messages.clear()
-            self.channels[channel_name].unacked_messages.clear()
-            return Response(message=f"Channel {channel_name} purged")
-        else:
+        channel = self.channels.get(channel_name)
+        if channel is None:
             return Response(error=f"Channel {channel_name} does not exist")
+        channel.ready_messages.clear()
+        channel.unacked_messages.clear()
+        return Response(message=f"Channel {channel_name} purged")
 
     async def stats(self, body) -> Response:
         channel_name = body.get("channel")
         stats_data = {}
         if channel_name is None:
-            for channel in self.channels.values():
-                stats_data[channel.name] = {
-                    "ready_messages": len(channel.ready_messages),
-                    "unacked_messages": len(channel.unacked_messages),
-                    "total": len(channel.ready_messages)
-                    + len(channel.unacked_messages),
-                }
-        elif channel_name and channel_name in self.channels:
-            channel = self.channels[channel_name]
-            stats_data[channel_name] = {
-                "ready_messages": len(channel.ready_messages),
-                "unacked_messages": len(channel.unacked_messages),
-                "total": len(channel.ready_messages)
-                + len(channel.unacked_messages),
+            stats_data = {
+                name: channel.stats()
+                for name, channel in self.channels.items()
             }
+        elif channel_name and (channel := self.channels.get(channel_name)):
+            stats_data[channel_name] = channel.stats()
         return Response(data=stats_data)
 
 
@@ -0,0 +1,14 @@
+# Optional: compile main.py into a C extension with Cython.
+#
+#   pip install cython setuptools
+#   python setup.py build_ext --inplace
+#
+# The resulting main.*.so shadows main.py, so `uvicorn main:app` picks
+# it up with no other changes. Delete the .so to go back to pure Python.
+from Cython.Build import cythonize
+from setuptools import setup
+
+setup(
+    name="e-broker",
+    ext_modules=cythonize(["main.py"], language_level=3),
+)